@@ -0,0 +1,38 @@
+"""add listing indexes
+
+Revision ID: 202610150001
+Revises: 202502140001
+Create Date: 2026-10-15 00:01:00.000000
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "202610150001"
+down_revision: str | None = "202502140001"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+# Btree indexes are scanned backwards for ORDER BY ... DESC, so ascending
+# columns serve the newest-first list endpoints as well. The trailing id
+# matches the (created_at, id) ordering and keyset seek.
+INDEXES = (
+    ("idx_posts_topic_created", "posts", ["topic_id", "created_at", "id"]),
+    ("idx_posts_created", "posts", ["created_at", "id"]),
+    ("idx_push_logs_created", "push_logs", ["created_at", "id"]),
+    ("idx_push_logs_status_created", "push_logs", ["status", "created_at", "id"]),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
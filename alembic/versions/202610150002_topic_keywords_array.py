@@ -0,0 +1,56 @@
+"""store topic keywords as a text array
+
+Revision ID: 202610150002
+Revises: 202610150001
+Create Date: 2026-10-15 00:02:00.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "202610150002"
+down_revision: str | None = "202610150001"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # ALTER COLUMN ... USING cannot take a subquery, so copy through a new column.
+    op.add_column(
+        "topics",
+        sa.Column(
+            "keywords_array",
+            postgresql.ARRAY(sa.String()),
+            nullable=False,
+            server_default=sa.text("'{}'"),
+        ),
+    )
+    op.execute(
+        "UPDATE topics SET keywords_array = "
+        "ARRAY(SELECT json_array_elements_text(keywords))"
+    )
+    op.drop_column("topics", "keywords")
+    op.alter_column("topics", "keywords_array", new_column_name="keywords")
+    op.create_index(
+        "idx_topics_keywords", "topics", ["keywords"], postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_topics_keywords", table_name="topics")
+    op.add_column(
+        "topics",
+        sa.Column(
+            "keywords_json",
+            sa.JSON(),
+            nullable=False,
+            server_default=sa.text("'[]'"),
+        ),
+    )
+    op.execute("UPDATE topics SET keywords_json = to_json(keywords)")
+    op.drop_column("topics", "keywords")
+    op.alter_column("topics", "keywords_json", new_column_name="keywords")
@@ -0,0 +1,29 @@
+"""add feed cache validators to topics
+
+Revision ID: 202610150003
+Revises: 202610150002
+Create Date: 2026-10-15 00:03:00.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "202610150003"
+down_revision: str | None = "202610150002"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("topics", sa.Column("etag", sa.String(length=255), nullable=True))
+    op.add_column(
+        "topics", sa.Column("last_modified", sa.String(length=255), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("topics", "last_modified")
+    op.drop_column("topics", "etag")
@@ -16,8 +16,14 @@ class Settings(BaseSettings):
     database_url: str
     sync_database_url: str
     redis_url: str
+    db_pool_size: int = 25
+    db_max_overflow: int = 25
+    db_pool_recycle: int = 1800
     celery_broker_url: Optional[str] = None
     celery_result_backend: Optional[str] = None
+    fetch_concurrency: int = 8
+    count_cache_ttl: int = 30
+    redis_socket_timeout: float = 0.25
     FRONTEND_ORIGINS: str = ""
 
     @field_validator("celery_broker_url", "celery_result_backend", mode="before")
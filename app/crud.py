@@ -1,12 +1,163 @@
 from __future__ import annotations
 
-from typing import Optional, Sequence, Tuple
+import asyncio
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
 
-from sqlalchemy import func, select
+from redis.exceptions import RedisError
+from sqlalchemy import ColumnElement, Select, func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload
 
 from . import models, schemas
+from .config import settings
+from .database import redis_client, sync_redis_client
+
+COUNT_CACHE_PREFIX = "cnt"
+
+
+def _generation_key(table: str) -> str:
+    return f"{COUNT_CACHE_PREFIX}:{table}:gen"
+
+
+async def count_cache_key(table: str, **filters: Any) -> Optional[str]:
+    """Build the Redis key caching the row count of ``table`` under ``filters``.
+
+    Keys embed the table's current generation, so ``invalidate_counts`` retires
+    them all with one ``INCR`` and the stale entries simply expire. Returns
+    ``None`` when the cache is disabled or Redis is unreachable.
+    """
+    if not settings.count_cache_ttl:
+        return None
+    try:
+        generation = int(await redis_client.get(_generation_key(table)) or 0)
+    except RedisError:
+        return None
+    active = {name: value for name, value in filters.items() if value is not None}
+    if not active:
+        return f"{COUNT_CACHE_PREFIX}:{table}:{generation}"
+    digest = hashlib.sha1(
+        json.dumps(active, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{COUNT_CACHE_PREFIX}:{table}:{generation}:{digest}"
+
+
+async def _get_cached_count(key: Optional[str]) -> Optional[int]:
+    if key is None:
+        return None
+    try:
+        value = await redis_client.get(key)
+    except RedisError:
+        return None
+    return int(value) if value is not None else None
+
+
+async def _set_cached_count(key: Optional[str], value: int) -> None:
+    if key is None:
+        return
+    try:
+        await redis_client.setex(key, settings.count_cache_ttl, value)
+    except RedisError:
+        pass
+
+
+def _bump_generations(client, tables: Sequence[str]):
+    # Works with both the asyncio and the blocking client; the caller awaits
+    # the result of the former.
+    pipe = client.pipeline(transaction=False)
+    for table in tables:
+        pipe.incr(_generation_key(table))
+    return pipe.execute()
+
+
+async def invalidate_counts(*tables: str) -> None:
+    """Drop every cached count, filtered or not, for the given tables."""
+    if not settings.count_cache_ttl:
+        return
+    try:
+        await _bump_generations(redis_client, tables)
+    except RedisError:
+        pass
+
+
+def invalidate_counts_sync(*tables: str) -> None:
+    """Blocking ``invalidate_counts`` for the Celery worker."""
+    if not settings.count_cache_ttl:
+        return
+    try:
+        _bump_generations(sync_redis_client, tables)
+    except RedisError:
+        pass
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a ``(created_at, id)`` keyset position as an opaque string."""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError as exc:
+        raise ValueError("Invalid cursor.") from exc
+
+
+async def _count_rows(session: AsyncSession, stmt: Select) -> int:
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return await session.scalar(count_stmt) or 0
+
+
+async def _fetch_page(
+    session: AsyncSession,
+    stmt: Select,
+    skip: int,
+    limit: int,
+    count_key: Optional[str],
+    seek: Optional[ColumnElement[bool]] = None,
+) -> Tuple[Sequence[Any], int]:
+    """Return one page of ``stmt`` together with the total row count.
+
+    ``seek`` is an optional keyset condition that narrows the page without
+    narrowing the total. A cached total (see ``count_cache_key``) lets the page
+    query skip counting altogether. Otherwise the total rides along as a
+    ``COUNT(*) OVER ()`` window column so the page and its total come back in a
+    single round trip. A short page already tells the exact total, which then
+    wins over the cached one.
+    """
+    cached_total = await _get_cached_count(count_key)
+    if cached_total is not None or seek is not None:
+        page_stmt = stmt if seek is None else stmt.where(seek)
+        result = await session.execute(page_stmt.offset(skip).limit(limit))
+        items = result.scalars().all()
+        if seek is None and len(items) < limit and (items or not skip):
+            return items, skip + len(items)
+        if cached_total is not None:
+            return items, cached_total
+        total = await _count_rows(session, stmt)
+        await _set_cached_count(count_key, total)
+        return items, total
+
+    result = await session.execute(
+        stmt.add_columns(func.count().over().label("total"))
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = result.all()
+    if rows:
+        total = rows[0].total
+    elif not skip:
+        total = 0
+    else:
+        # A page past the end has no rows to carry the window value.
+        total = await _count_rows(session, stmt)
+    await _set_cached_count(count_key, total)
+    return [row[0] for row in rows], total
 
 
 async def create_topic(
@@ -15,7 +166,7 @@ async def create_topic(
     topic = models.Topic(**topic_in.model_dump())
     session.add(topic)
     await session.commit()
-    await session.refresh(topic)
+    await invalidate_counts("topics")
     return topic
 
 
@@ -33,36 +184,43 @@ async def get_topic_by_name(
 
 
 async def list_topics(
-    session: AsyncSession, skip: int = 0, limit: int = 20
+    session: AsyncSession,
+    skip: int = 0,
+    limit: int = 20,
+    after_id: Optional[int] = None,
 ) -> Tuple[Sequence[models.Topic], int]:
-    total_result = await session.execute(
-        select(func.count()).select_from(models.Topic)
-    )
-    total = total_result.scalar_one()
+    stmt = select(models.Topic).order_by(models.Topic.id)
 
-    result = await session.execute(
-        select(models.Topic)
-        .order_by(models.Topic.id)
-        .offset(skip)
-        .limit(limit)
-    )
-    topics = result.scalars().all()
-    return topics, total
+    seek = None
+    if after_id is not None:
+        seek = models.Topic.id > after_id
+
+    count_key = await count_cache_key("topics")
+    return await _fetch_page(session, stmt, skip, limit, count_key, seek)
 
 
 async def update_topic(
     session: AsyncSession, topic: models.Topic, topic_in: schemas.TopicUpdate
 ) -> models.Topic:
-    for field, value in topic_in.model_dump(exclude_unset=True).items():
+    changes = topic_in.model_dump(exclude_unset=True)
+    for field, value in changes.items():
         setattr(topic, field, value)
+    if "feed_url" in changes or "keywords" in changes:
+        # Cached validators describe the old feed/filter; force a full refetch.
+        topic.etag = topic.last_modified = None
     await session.commit()
-    await session.refresh(topic)
+    if "source" in changes:
+        # Post counts filtered by source join through the topic.
+        await invalidate_counts("topics", "posts")
+    else:
+        await invalidate_counts("topics")
     return topic
 
 
 async def delete_topic(session: AsyncSession, topic: models.Topic) -> None:
     await session.delete(topic)
     await session.commit()
+    await invalidate_counts("topics", "posts", "push_logs")
 
 
 async def list_posts(
@@ -71,26 +229,27 @@ async def list_posts(
     limit: int = 20,
     topic_id: Optional[int] = None,
     source: Optional[str] = None,
+    cursor: Optional[Tuple[datetime, int]] = None,
 ) -> Tuple[Sequence[models.Post], int]:
-    stmt = select(models.Post).order_by(models.Post.created_at.desc())
-    count_stmt = select(func.count()).select_from(models.Post)
+    stmt = (
+        select(models.Post)
+        .order_by(models.Post.created_at.desc(), models.Post.id.desc())
+        # The page schema only exposes topic_id; never load the parent row.
+        .options(raiseload(models.Post.topic))
+    )
 
     if topic_id is not None:
         stmt = stmt.where(models.Post.topic_id == topic_id)
-        count_stmt = count_stmt.where(models.Post.topic_id == topic_id)
 
     if source is not None:
         stmt = stmt.join(models.Topic).where(models.Topic.source == source)
-        count_stmt = count_stmt.join(models.Topic).where(models.Topic.source == source)
 
-    count_result = await session.execute(count_stmt)
-    total = count_result.scalar_one()
+    seek = None
+    if cursor is not None:
+        seek = tuple_(models.Post.created_at, models.Post.id) < cursor
 
-    result = await session.execute(
-        stmt.options(selectinload(models.Post.topic)).offset(skip).limit(limit)
-    )
-    posts = result.scalars().all()
-    return posts, total
+    count_key = await count_cache_key("posts", topic_id=topic_id, source=source)
+    return await _fetch_page(session, stmt, skip, limit, count_key, seek)
 
 
 async def list_push_logs(
@@ -98,42 +257,73 @@ async def list_push_logs(
     skip: int = 0,
     limit: int = 20,
     status: Optional[str] = None,
+    cursor: Optional[Tuple[datetime, int]] = None,
 ) -> Tuple[Sequence[models.PushLog], int]:
-    stmt = select(models.PushLog).order_by(models.PushLog.created_at.desc())
-    count_stmt = select(func.count()).select_from(models.PushLog)
+    stmt = (
+        select(models.PushLog)
+        .order_by(models.PushLog.created_at.desc(), models.PushLog.id.desc())
+        .options(raiseload(models.PushLog.post))
+    )
 
     if status is not None:
         stmt = stmt.where(models.PushLog.status == status)
-        count_stmt = count_stmt.where(models.PushLog.status == status)
 
-    count_result = await session.execute(count_stmt)
-    total = count_result.scalar_one()
+    seek = None
+    if cursor is not None:
+        seek = tuple_(models.PushLog.created_at, models.PushLog.id) < cursor
 
-    result = await session.execute(
-        stmt.options(selectinload(models.PushLog.post))
-        .offset(skip)
-        .limit(limit)
-    )
-    logs = result.scalars().all()
-    return logs, total
+    count_key = await count_cache_key("push_logs", status=status)
+    return await _fetch_page(session, stmt, skip, limit, count_key, seek)
 
 
 async def get_system_stats(session: AsyncSession) -> dict:
-    topics_total = await session.scalar(
-        select(func.count()).select_from(models.Topic)
-    )
-    active_topics = await session.scalar(
-        select(func.count()).select_from(models.Topic).where(models.Topic.is_active)
-    )
-    posts_total = await session.scalar(
-        select(func.count()).select_from(models.Post)
-    )
-    logs_total = await session.scalar(
-        select(func.count()).select_from(models.PushLog)
+    """Return the dashboard counters.
+
+    Cache lookups run concurrently, and whichever counters miss are computed
+    together as scalar subqueries of one ``SELECT`` so the database is hit at
+    most once per call.
+    """
+    topics_key, posts_key, logs_key = await asyncio.gather(
+        count_cache_key("topics"),
+        count_cache_key("posts"),
+        count_cache_key("push_logs"),
     )
-    return {
-        "topics_total": topics_total or 0,
-        "active_topics": active_topics or 0,
-        "posts_total": posts_total or 0,
-        "logs_total": logs_total or 0,
+    counters = {
+        "topics_total": (
+            topics_key,
+            select(func.count()).select_from(models.Topic),
+        ),
+        "active_topics": (
+            f"{topics_key}:active" if topics_key else None,
+            select(func.count())
+            .select_from(models.Topic)
+            .where(models.Topic.is_active),
+        ),
+        "posts_total": (
+            posts_key,
+            select(func.count()).select_from(models.Post),
+        ),
+        "logs_total": (
+            logs_key,
+            select(func.count()).select_from(models.PushLog),
+        ),
     }
+    cached = await asyncio.gather(
+        *(_get_cached_count(key) for key, _ in counters.values())
+    )
+    stats = dict(zip(counters, cached))
+
+    missing = [name for name, value in stats.items() if value is None]
+    if missing:
+        result = await session.execute(
+            select(
+                *(counters[name][1].scalar_subquery().label(name) for name in missing)
+            )
+        )
+        row = result.one()
+        for name in missing:
+            stats[name] = row._mapping[name] or 0
+        await asyncio.gather(
+            *(_set_cached_count(counters[name][0], stats[name]) for name in missing)
+        )
+    return stats
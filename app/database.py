@@ -1,12 +1,32 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from sqlalchemy import create_engine
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from .config import settings
 
+# Server-side statement caches are asyncpg options; other drivers reject them.
+_ASYNC_CONNECT_ARGS = (
+    {"statement_cache_size": 1024, "prepared_statement_cache_size": 256}
+    if make_url(settings.database_url).get_driver_name() == "asyncpg"
+    else {}
+)
+
 
-async_engine = create_async_engine(settings.database_url, echo=False, future=True)
+async_engine = create_async_engine(
+    settings.database_url,
+    echo=False,
+    future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=True,
+    pool_use_lifo=True,
+    connect_args=_ASYNC_CONNECT_ARGS,
+)
 async_session_factory = async_sessionmaker(
     async_engine,
     expire_on_commit=False,
@@ -14,9 +34,30 @@ async_session_factory = async_sessionmaker(
 
 sync_engine = create_engine(settings.sync_database_url, pool_pre_ping=True, future=True)
 
+# The count cache is optional; an unreachable Redis must not stall reads.
+_REDIS_TIMEOUTS = {
+    "socket_timeout": settings.redis_socket_timeout,
+    "socket_connect_timeout": settings.redis_socket_timeout,
+}
+redis_client = aioredis.from_url(settings.redis_url, **_REDIS_TIMEOUTS)
+sync_redis_client = redis.Redis.from_url(settings.redis_url, **_REDIS_TIMEOUTS)
+
 
 @asynccontextmanager
 async def get_async_session() -> AsyncSession:
     async with async_session_factory() as session:
         yield session
 
+
+async def warm_up_pool() -> None:
+    """Open ``db_pool_size`` connections up front so early requests skip connecting."""
+    results = await asyncio.gather(
+        *(async_engine.connect() for _ in range(settings.db_pool_size)),
+        return_exceptions=True,
+    )
+    connections = [conn for conn in results if not isinstance(conn, BaseException)]
+    # Check every opened connection back in, even if some of the connects failed.
+    await asyncio.gather(*(conn.close() for conn in connections))
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
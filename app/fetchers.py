@@ -2,14 +2,63 @@ from __future__ import annotations
 
 import asyncio
 import calendar
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Mapping
+from functools import lru_cache
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import feedparser
 import httpx
 
 USER_AGENT = "TechForumMonitor/0.1 (+https://example.com)"
 
+# HTTP cache validators of a feed: {"etag": ..., "last_modified": ...}.
+FeedValidators = Dict[str, Optional[str]]
+
+# Feed parsing is CPU-bound; keep it off the loop's default executor.
+_PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="feed-parse")
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared client, rebuilding it when the running loop changed.
+
+    Connections belong to the loop that opened them, so Celery's per-run
+    ``asyncio.run`` loops each get a fresh client instead of a dead pool.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=15.0,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
 
 def _entry_to_dict(entry: Mapping[str, Any], source: str) -> Dict[str, Any]:
     link = entry.get("link") or entry.get("id") or ""
@@ -39,50 +88,110 @@ def _entry_to_dict(entry: Mapping[str, Any], source: str) -> Dict[str, Any]:
     }
 
 
-async def _fetch_and_parse(feed_url: str) -> feedparser.FeedParserDict:
-    async with httpx.AsyncClient(timeout=15.0, headers={"User-Agent": USER_AGENT}) as client:
-        response = await client.get(feed_url)
-        response.raise_for_status()
-        body = response.text
-    return await asyncio.to_thread(feedparser.parse, body)
+async def _fetch_and_parse(
+    feed_url: str, validators: Optional[FeedValidators] = None
+) -> Optional[feedparser.FeedParserDict]:
+    """Download and parse a feed, or return ``None`` if it is unchanged.
+
+    When ``validators`` is given, its ``etag``/``last_modified`` values are sent
+    as conditional headers and replaced with the ones from a fresh response.
+    """
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    response = await _get_client().get(feed_url, headers=headers)
+    if response.status_code == httpx.codes.NOT_MODIFIED:
+        return None
+    response.raise_for_status()
+    if validators is not None:
+        validators["etag"] = response.headers.get("etag")
+        validators["last_modified"] = response.headers.get("last-modified")
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _PARSE_EXECUTOR, feedparser.parse, response.content
+    )
 
 
-async def _fetch_generic_feed(feed_url: str, source: str) -> List[Dict[str, Any]]:
-    parsed = await _fetch_and_parse(feed_url)
+async def _fetch_generic_feed(
+    feed_url: str, source: str, validators: Optional[FeedValidators] = None
+) -> Optional[List[Dict[str, Any]]]:
+    parsed = await _fetch_and_parse(feed_url, validators)
+    if parsed is None:
+        return None
     entries = parsed.entries if hasattr(parsed, "entries") else []
     return [_entry_to_dict(entry, source) for entry in entries]
 
 
-async def fetch_v2ex_feed(feed_url: str) -> List[Dict[str, Any]]:
-    return await _fetch_generic_feed(feed_url, "v2ex")
+async def fetch_v2ex_feed(
+    feed_url: str, validators: Optional[FeedValidators] = None
+) -> Optional[List[Dict[str, Any]]]:
+    return await _fetch_generic_feed(feed_url, "v2ex", validators)
 
 
-async def fetch_nodeseek_feed(feed_url: str) -> List[Dict[str, Any]]:
-    return await _fetch_generic_feed(feed_url, "nodeseek")
+async def fetch_nodeseek_feed(
+    feed_url: str, validators: Optional[FeedValidators] = None
+) -> Optional[List[Dict[str, Any]]]:
+    return await _fetch_generic_feed(feed_url, "nodeseek", validators)
 
 
-async def fetch_linux_do_feed(feed_url: str) -> List[Dict[str, Any]]:
-    return await _fetch_generic_feed(feed_url, "linux.do")
+async def fetch_linux_do_feed(
+    feed_url: str, validators: Optional[FeedValidators] = None
+) -> Optional[List[Dict[str, Any]]]:
+    return await _fetch_generic_feed(feed_url, "linux.do", validators)
 
 
-async def fetch_feed(source: str, feed_url: str) -> List[Dict[str, Any]]:
-    fetchers = {
-        "v2ex": fetch_v2ex_feed,
-        "nodeseek": fetch_nodeseek_feed,
-        "linux.do": fetch_linux_do_feed,
-    }
+_FETCHERS: Dict[str, Callable[..., Awaitable[Optional[List[Dict[str, Any]]]]]] = {
+    "v2ex": fetch_v2ex_feed,
+    "nodeseek": fetch_nodeseek_feed,
+    "linux.do": fetch_linux_do_feed,
+}
+
+
+async def fetch_feed(
+    source: str, feed_url: str, validators: Optional[FeedValidators] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """Fetch and normalize a feed's entries.
+
+    Returns ``None`` when conditional ``validators`` show the feed unchanged.
+    """
     try:
-        fetcher = fetchers[source.lower()]
+        fetcher = _FETCHERS[source.lower()]
     except KeyError as exc:
         raise ValueError(f"Unsupported source: {source}") from exc
-    return await fetcher(feed_url)
+    return await fetcher(feed_url, validators)
 
 
-def match_keywords(text: str | None, keywords: List[str]) -> bool:
+@lru_cache(maxsize=1024)
+def _lowered_keywords(keywords: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(keyword.lower() for keyword in keywords)
+
+
+def normalize_keywords(keywords: Iterable[str] | None) -> Tuple[str, ...]:
+    return _lowered_keywords(tuple(keywords or ()))
+
+
+@lru_cache(maxsize=512)
+def _keyword_pattern(keywords: Tuple[str, ...]) -> re.Pattern[str]:
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+def match_normalized_keywords(text: str | None, keywords: Sequence[str]) -> bool:
+    """Like ``match_keywords`` but for keywords already passed through
+    ``normalize_keywords``, so callers matching many texts lower them once.
+
+    All keywords are searched in one pass with a cached alternation pattern.
+    """
     if not keywords:
         return True
     if not text:
         return False
-    lowered = text.lower()
-    return any(keyword.lower() in lowered for keyword in keywords)
+    return _keyword_pattern(tuple(keywords)).search(text.lower()) is not None
+
 
+def match_keywords(text: str | None, keywords: List[str]) -> bool:
+    return match_normalized_keywords(text, normalize_keywords(keywords))
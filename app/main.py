@@ -1,7 +1,11 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 
+import asyncpg
 from fastapi import (
     Depends,
     FastAPI,
@@ -11,15 +15,45 @@ from fastapi import (
     status,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.exc import IntegrityError
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from . import crud, schemas
+from . import crud, fetchers, schemas
 from .config import settings
-from .database import get_async_session
+from .database import async_engine, get_async_session, warm_up_pool
 
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Tech Forum Monitor API", version="0.1.0")
+TopicPage = schemas.PaginatedResponse[schemas.TopicRead]
+PostPage = schemas.PaginatedResponse[schemas.PostRead]
+PushLogPage = schemas.PaginatedResponse[schemas.PushLogRead]
+
+_TOPIC_LIST = TypeAdapter(List[schemas.TopicRead])
+_POST_LIST = TypeAdapter(List[schemas.PostRead])
+_PUSH_LOG_LIST = TypeAdapter(List[schemas.PushLogRead])
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    try:
+        await warm_up_pool()
+    # asyncpg's connect errors (bad password, too many connections) reach us
+    # untranslated by SQLAlchemy.
+    except (OSError, SQLAlchemyError, asyncpg.PostgresError):
+        logger.warning("Database pool warm-up failed", exc_info=True)
+    yield
+    await fetchers.close_client()
+    await async_engine.dispose()
+
+
+app = FastAPI(
+    title="Tech Forum Monitor API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +69,24 @@ async def get_session() -> AsyncSession:
         yield session
 
 
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    if cursor is None:
+        return None
+    try:
+        return crud.decode_cursor(cursor)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        ) from exc
+
+
+def _next_cursor(rows: Sequence, limit: int) -> Optional[str]:
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return crud.encode_cursor(last.created_at, last.id)
+
+
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     return {"status": "ok"}
@@ -42,20 +94,25 @@ async def health_check() -> dict[str, str]:
 
 @app.get(
     "/api/v1/topics",
-    response_model=schemas.PaginatedResponse[schemas.TopicRead],
+    response_model=TopicPage,
 )
 async def list_topics(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    after_id: Optional[int] = Query(None, ge=0),
     session: AsyncSession = Depends(get_session),
-) -> schemas.PaginatedResponse[schemas.TopicRead]:
-    topics, total = await crud.list_topics(session, skip=skip, limit=limit)
-    items = [schemas.TopicRead.model_validate(topic) for topic in topics]
-    return schemas.PaginatedResponse[schemas.TopicRead](
+) -> TopicPage:
+    topics, total = await crud.list_topics(
+        session, skip=skip, limit=limit, after_id=after_id
+    )
+    items = _TOPIC_LIST.validate_python(topics, from_attributes=True)
+    return TopicPage(
         items=items,
         total=total,
         skip=skip,
         limit=limit,
+        # Topics page by id; pass this back as ``after_id``.
+        next_cursor=str(topics[-1].id) if len(topics) == limit else None,
     )
 
 
@@ -130,53 +187,63 @@ async def delete_topic(
 
 @app.get(
     "/api/v1/posts",
-    response_model=schemas.PaginatedResponse[schemas.PostRead],
+    response_model=PostPage,
 )
 async def list_posts(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     topic_id: Optional[int] = Query(None, ge=1),
     source: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
     session: AsyncSession = Depends(get_session),
-) -> schemas.PaginatedResponse[schemas.PostRead]:
+) -> ORJSONResponse:
     posts, total = await crud.list_posts(
         session,
         skip=skip,
         limit=limit,
         topic_id=topic_id,
         source=source,
+        cursor=_parse_cursor(cursor),
     )
-    items = [schemas.PostRead.model_validate(post) for post in posts]
-    return schemas.PaginatedResponse[schemas.PostRead](
-        items=items,
-        total=total,
-        skip=skip,
-        limit=limit,
+    items = _POST_LIST.validate_python(posts, from_attributes=True)
+    return ORJSONResponse(
+        {
+            "items": _POST_LIST.dump_python(items, mode="json"),
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": _next_cursor(posts, limit),
+        }
     )
 
 
 @app.get(
     "/api/v1/logs",
-    response_model=schemas.PaginatedResponse[schemas.PushLogRead],
+    response_model=PushLogPage,
 )
 async def list_logs(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     status_filter: Optional[str] = Query(None, alias="status"),
+    cursor: Optional[str] = Query(None),
     session: AsyncSession = Depends(get_session),
-) -> schemas.PaginatedResponse[schemas.PushLogRead]:
+) -> ORJSONResponse:
     logs, total = await crud.list_push_logs(
         session,
         skip=skip,
         limit=limit,
         status=status_filter,
+        cursor=_parse_cursor(cursor),
     )
-    items = [schemas.PushLogRead.model_validate(log) for log in logs]
-    return schemas.PaginatedResponse[schemas.PushLogRead](
-        items=items,
-        total=total,
-        skip=skip,
-        limit=limit,
+    items = _PUSH_LOG_LIST.validate_python(logs, from_attributes=True)
+    return ORJSONResponse(
+        {
+            "items": _PUSH_LOG_LIST.dump_python(items, mode="json"),
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": _next_cursor(logs, limit),
+        }
     )
 
 
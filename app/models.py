@@ -8,11 +8,13 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     String,
     Text,
     UniqueConstraint,
     func,
 )
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -40,13 +42,22 @@ class CreatedAtMixin:
 
 class Topic(TimestampMixin, Base):
     __tablename__ = "topics"
+    __table_args__ = (
+        Index("idx_topics_keywords", "keywords", postgresql_using="gin"),
+    )
+    # Fetch created_at/updated_at via RETURNING on flush instead of a refresh.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     source: Mapped[str] = mapped_column(String(50), nullable=False)
     feed_url: Mapped[str] = mapped_column(String(500), nullable=False)
-    keywords: Mapped[List[str]] = mapped_column(JSON, default=list)
+    keywords: Mapped[List[str]] = mapped_column(
+        JSON().with_variant(ARRAY(String), "postgresql"), default=list
+    )
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    etag: Mapped[Optional[str]] = mapped_column(String(255), default=None)
+    last_modified: Mapped[Optional[str]] = mapped_column(String(255), default=None)
 
     posts: Mapped[List["Post"]] = relationship(
         back_populates="topic", cascade="all, delete-orphan"
@@ -55,7 +66,11 @@ class Topic(TimestampMixin, Base):
 
 class Post(CreatedAtMixin, Base):
     __tablename__ = "posts"
-    __table_args__ = (UniqueConstraint("uid", name="uq_posts_uid"),)
+    __table_args__ = (
+        UniqueConstraint("uid", name="uq_posts_uid"),
+        Index("idx_posts_topic_created", "topic_id", "created_at", "id"),
+        Index("idx_posts_created", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     topic_id: Mapped[int] = mapped_column(
@@ -76,6 +91,10 @@ class Post(CreatedAtMixin, Base):
 
 class PushLog(CreatedAtMixin, Base):
     __tablename__ = "push_logs"
+    __table_args__ = (
+        Index("idx_push_logs_created", "created_at", "id"),
+        Index("idx_push_logs_status_created", "status", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     post_id: Mapped[int] = mapped_column(
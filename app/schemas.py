@@ -3,8 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Generic, List, Optional, TypeVar
 
-from pydantic import BaseModel, Field
-from pydantic.generics import GenericModel
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TopicBase(BaseModel):
@@ -28,13 +27,12 @@ class TopicUpdate(BaseModel):
 
 
 class TopicRead(TopicBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class PostBase(BaseModel):
     title: str
@@ -50,13 +48,12 @@ class PostCreate(PostBase):
 
 
 class PostRead(PostBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     topic_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class PushLogBase(BaseModel):
     status: str = "pending"
@@ -68,20 +65,20 @@ class PushLogCreate(PushLogBase):
 
 
 class PushLogRead(PushLogBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     post_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 T = TypeVar("T")
 
 
-class PaginatedResponse(GenericModel, Generic[T]):
+class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
     total: int
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
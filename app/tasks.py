@@ -2,18 +2,29 @@ from __future__ import annotations
 
 import asyncio
 from collections.abc import Sequence
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from celery import Celery
 from celery.schedules import crontab
-from sqlalchemy import select
+from celery.utils.log import get_task_logger
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session, sessionmaker
 
 from .config import settings
+from .crud import invalidate_counts_sync
 from .database import sync_engine
-from .fetchers import fetch_feed, match_keywords
+from .fetchers import (
+    FeedValidators,
+    close_client,
+    fetch_feed,
+    match_normalized_keywords,
+    normalize_keywords,
+)
 from . import models
 
+logger = get_task_logger(__name__)
+
 celery_app = Celery(
     "app.tasks",
     broker=settings.celery_broker_url,
@@ -30,6 +41,8 @@ celery_app.conf.beat_schedule = {
 
 SessionLocal = sessionmaker(bind=sync_engine, expire_on_commit=False, future=True)
 
+_CONFLICT_AWARE_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
 
 def _get_active_topics(session: Session) -> Sequence[models.Topic]:
     return (
@@ -39,61 +52,178 @@ def _get_active_topics(session: Session) -> Sequence[models.Topic]:
     )
 
 
-def _uid_exists(session: Session, uid: str) -> bool:
-    return (
-        session.execute(select(models.Post.id).where(models.Post.uid == uid))
-        .scalar_one_or_none()
-        is not None
+def _existing_uids(session: Session, uids: Sequence[str]) -> set[str]:
+    if not uids:
+        return set()
+    return set(
+        session.execute(select(models.Post.uid).where(models.Post.uid.in_(uids)))
+        .scalars()
+        .all()
     )
 
 
+def _insert_posts(session: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert ``rows`` into posts in one statement and return the new ids.
+
+    Rows whose UID was stored concurrently are skipped by ``ON CONFLICT DO
+    NOTHING`` and simply produce no id.
+    """
+    dialect_insert = _CONFLICT_AWARE_INSERTS.get(session.get_bind().dialect.name)
+    if dialect_insert is None:
+        stmt = insert(models.Post).values(rows)
+    else:
+        stmt = dialect_insert(models.Post).values(rows).on_conflict_do_nothing(
+            index_elements=["uid"]
+        )
+    return session.execute(stmt.returning(models.Post.id)).scalars().all()
+
+
+async def _fetch_all(
+    topics: Sequence[models.Topic], validators: Sequence[FeedValidators]
+) -> List[Union[Optional[List[Dict[str, Any]]], BaseException]]:
+    """Fetch every topic's feed, returning results (or errors) in topic order.
+
+    A fixed pool of workers drains a queue of topic indexes, so at most
+    ``fetch_concurrency`` requests (and coroutines) are in flight at once.
+    """
+    results: List[Union[Optional[List[Dict[str, Any]]], BaseException]] = [
+        None
+    ] * len(topics)
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for index in range(len(topics)):
+        queue.put_nowait(index)
+
+    async def worker() -> None:
+        while not queue.empty():
+            index = queue.get_nowait()
+            topic = topics[index]
+            try:
+                results[index] = await fetch_feed(
+                    topic.source, topic.feed_url, validators[index]
+                )
+            except Exception as exc:  # reported per topic by the caller
+                results[index] = exc
+
+    try:
+        workers = min(len(topics), max(settings.fetch_concurrency, 1))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
+    finally:
+        # The client's connections die with this asyncio.run loop.
+        await close_client()
+
+
 def _should_keep_entry(entry: Dict[str, Any], keywords: Sequence[str] | None) -> bool:
-    text_parts = [entry.get("title"), entry.get("summary")]
-    combined = " ".join(part for part in text_parts if part)
-    keyword_list = list(keywords) if keywords else []
-    return match_keywords(combined, keyword_list)
+    """Match an entry's title and summary against lowercased ``keywords``."""
+    if not keywords:
+        return True
+    title, summary = entry.get("title"), entry.get("summary")
+    if not title and not summary:
+        return False
+    text = f"{title} {summary}" if title and summary else title or summary
+    return match_normalized_keywords(text, keywords)
+
+
+def _store_entries(
+    session: Session, topic: models.Topic, entries: List[Dict[str, Any]]
+) -> Tuple[int, int]:
+    """Insert a topic's new matching entries; return ``(created, duplicates)``."""
+    existing = _existing_uids(session, [entry["uid"] for entry in entries])
+    keywords = normalize_keywords(topic.keywords)
+    duplicates = 0
+    rows = []
+    for entry in entries:
+        uid = entry["uid"]
+
+        if uid in existing:
+            duplicates += 1
+            continue
+
+        if not _should_keep_entry(entry, keywords):
+            continue
+
+        rows.append(
+            {
+                "topic_id": topic.id,
+                "title": entry["title"],
+                "content": entry.get("summary"),
+                "link": entry["link"],
+                "uid": uid,
+                "published_at": entry["published_at"],
+            }
+        )
+        existing.add(uid)
+
+    if not rows:
+        return 0, duplicates
+
+    post_ids = _insert_posts(session, rows)
+    if post_ids:
+        session.execute(
+            insert(models.PushLog),
+            [{"post_id": post_id, "status": "pending"} for post_id in post_ids],
+        )
+    return len(post_ids), duplicates + len(rows) - len(post_ids)
+
+
+def _store_validators(
+    session: Session, topic: models.Topic, validators: FeedValidators
+) -> None:
+    """Persist a topic's new ETag/Last-Modified without bumping ``updated_at``.
+
+    ``updated_at`` reports the last user edit, not the last crawl, so the
+    column's ``onupdate`` is overridden with its current value.
+    """
+    if (validators["etag"], validators["last_modified"]) == (
+        topic.etag,
+        topic.last_modified,
+    ):
+        return
+    session.execute(
+        update(models.Topic)
+        .where(models.Topic.id == topic.id)
+        .values(
+            etag=validators["etag"],
+            last_modified=validators["last_modified"],
+            updated_at=models.Topic.updated_at,
+        )
+    )
 
 
 @celery_app.task(name="app.tasks.fetch_all_topics")
 def fetch_all_topics() -> Dict[str, int]:
-    session = SessionLocal()
     stats = {"topics_checked": 0, "posts_created": 0, "duplicates": 0}
     try:
-        topics = _get_active_topics(session)
-        stats["topics_checked"] = len(topics)
-
-        for topic in topics:
-            entries = asyncio.run(fetch_feed(topic.source, topic.feed_url))
-            for entry in entries:
-                uid = entry["uid"]
-
-                if _uid_exists(session, uid):
-                    stats["duplicates"] += 1
+        with SessionLocal() as session:
+            with session.begin():
+                topics = _get_active_topics(session)
+            stats["topics_checked"] = len(topics)
+
+            validators = [
+                {"etag": topic.etag, "last_modified": topic.last_modified}
+                for topic in topics
+            ]
+            results = asyncio.run(_fetch_all(topics, validators)) if topics else []
+
+            for topic, topic_validators, entries in zip(topics, validators, results):
+                if isinstance(entries, BaseException):
+                    logger.warning(
+                        "Failed to fetch feed for topic %s", topic.id, exc_info=entries
+                    )
                     continue
-
-                if not _should_keep_entry(entry, topic.keywords):
+                if entries is None:
+                    # 304 Not Modified: nothing new since the last fetch.
                     continue
 
-                post = models.Post(
-                    topic_id=topic.id,
-                    title=entry["title"],
-                    content=entry.get("summary"),
-                    link=entry["link"],
-                    uid=uid,
-                    published_at=entry["published_at"],
-                )
-                session.add(post)
-                session.flush()
-
-                log = models.PushLog(post_id=post.id, status="pending")
-                session.add(log)
-                stats["posts_created"] += 1
-
-        session.commit()
-    except Exception:
-        session.rollback()
-        raise
+                # One transaction per topic; nothing is pending between the
+                # UID lookup and the bulk insert, so autoflush only costs time.
+                with session.begin(), session.no_autoflush:
+                    created, duplicates = _store_entries(session, topic, entries)
+                    _store_validators(session, topic, topic_validators)
+                stats["posts_created"] += created
+                stats["duplicates"] += duplicates
     finally:
-        session.close()
-
+        # Earlier topics are already committed even if a later one raised.
+        if stats["posts_created"]:
+            invalidate_counts_sync("posts", "push_logs")
     return stats
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 
 import pytest
 
 from app import crud, schemas
 from app import models
-from .conftest import AsyncSessionWrapper
+from .conftest import AsyncSessionWrapper, NOW
+
+_LONG_KEYWORDS = tuple(f"keyword{i}" for i in range(50))
 
 
-@pytest.mark.asyncio
 async def test_create_get_update_delete_topic(session: AsyncSessionWrapper) -> None:
     topic_in = schemas.TopicCreate(
         name="V2EX Python",
@@ -43,61 +44,78 @@ async def test_create_get_update_delete_topic(session: AsyncSessionWrapper) -> N
     assert topics_after_delete == []
 
 
-@pytest.mark.asyncio
-async def test_list_posts_filters(session: AsyncSessionWrapper) -> None:
-    base_time = datetime.now(timezone.utc)
-    topic_a = models.Topic(
-        name="NodeSeek",
-        source="nodeseek",
-        feed_url="https://www.nodeseek.com/rss",
-        keywords=["neo"],
-        is_active=True,
+async def test_list_topics_keyset(session: AsyncSessionWrapper) -> None:
+    topics = [
+        models.Topic(
+            name=f"Topic {i}",
+            source="v2ex",
+            feed_url=f"https://example.com/rss{i}",
+            keywords=[],
+            is_active=True,
+        )
+        for i in range(5)
+    ]
+    session.add_all(topics)
+    await session.commit()
+
+    page, total = await crud.list_topics(session, limit=2, after_id=topics[2].id)
+    assert [topic.id for topic in page] == [topics[3].id, topics[4].id]
+    assert total == 5
+
+
+async def test_create_topic_with_long_keyword_list(session: AsyncSessionWrapper) -> None:
+    created = await crud.create_topic(
+        session,
+        schemas.TopicCreate(
+            name="Many Keywords Topic",
+            source="v2ex",
+            feed_url="https://example.com/rss",
+            keywords=list(_LONG_KEYWORDS),
+            is_active=True,
+        ),
     )
-    topic_b = models.Topic(
-        name="Linux.do",
-        source="linux.do",
-        feed_url="https://linux.do/rss",
-        keywords=["linux"],
+    assert created.keywords == list(_LONG_KEYWORDS)
+
+
+async def test_update_topic_feed_change_clears_validators(
+    session: AsyncSessionWrapper,
+) -> None:
+    topic = models.Topic(
+        name="V2EX Hot",
+        source="v2ex",
+        feed_url="https://www.v2ex.com/rss",
+        keywords=["hot"],
         is_active=True,
+        etag='"abc"',
+        last_modified="Mon, 01 Jan 2024 00:00:00 GMT",
     )
-    session.add_all([topic_a, topic_b])
-    await session.flush()
+    session.add(topic)
+    await session.commit()
 
-    posts = [
-        models.Post(
-            topic_id=topic_a.id,
-            title="NodeSeek Post 1",
-            content="content",
-            link="https://nodeseek.com/p/1",
-            uid="nodeseek:1",
-            published_at=base_time,
-            created_at=base_time,
-        ),
-        models.Post(
-            topic_id=topic_a.id,
-            title="NodeSeek Post 2",
-            content=None,
-            link="https://nodeseek.com/p/2",
-            uid="nodeseek:2",
-            published_at=base_time + timedelta(minutes=1),
-            created_at=base_time + timedelta(minutes=1),
-        ),
-        models.Post(
-            topic_id=topic_b.id,
-            title="Linux.do Post 1",
-            content="linux",
-            link="https://linux.do/p/1",
-            uid="linux:1",
-            published_at=base_time + timedelta(minutes=2),
-            created_at=base_time + timedelta(minutes=2),
-        ),
-    ]
-    session.add_all(posts)
+    await crud.update_topic(session, topic, schemas.TopicUpdate(is_active=False))
+    assert topic.etag == '"abc"'
+    assert topic.last_modified is not None
+
+    await crud.update_topic(
+        session, topic, schemas.TopicUpdate(feed_url="https://www.v2ex.com/rss/new")
+    )
+    assert topic.etag is None
+    assert topic.last_modified is None
+
+    topic.etag = '"def"'
     await session.commit()
+    await crud.update_topic(session, topic, schemas.TopicUpdate(keywords=["python"]))
+    assert topic.etag is None
+
+
+async def test_list_posts_filters(
+    session: AsyncSessionWrapper, seeded_posts
+) -> None:
+    (topic_a, topic_b), _ = seeded_posts
 
     all_posts, total = await crud.list_posts(session, skip=0, limit=10)
     assert total == 3
-    assert [post.uid for post in all_posts] == ["linux:1", "nodeseek:2", "nodeseek:1"]
+    assert [post.uid for post in all_posts] == ["linux:1", "v2ex:2", "v2ex:1"]
 
     filtered_by_topic, total_topic = await crud.list_posts(
         session, skip=0, limit=10, topic_id=topic_a.id
@@ -112,7 +130,15 @@ async def test_list_posts_filters(session: AsyncSessionWrapper) -> None:
     assert filtered_by_source[0].topic_id == topic_b.id
 
 
-@pytest.mark.asyncio
+async def test_list_posts_past_the_end_reports_real_total(
+    session: AsyncSessionWrapper, seeded_posts
+) -> None:
+    # No row carries the window count here, so the total is counted separately.
+    posts, total = await crud.list_posts(session, skip=100, limit=10)
+    assert posts == []
+    assert total == 3
+
+
 async def test_list_push_logs(session: AsyncSessionWrapper) -> None:
     topic = models.Topic(
         name="V2EX Hot",
@@ -130,7 +156,7 @@ async def test_list_push_logs(session: AsyncSessionWrapper) -> None:
         content="hot content",
         link="https://www.v2ex.com/t/1",
         uid="v2ex:1",
-        published_at=datetime.now(timezone.utc),
+        published_at=NOW,
     )
     session.add(post)
     await session.flush()
@@ -151,3 +177,141 @@ async def test_list_push_logs(session: AsyncSessionWrapper) -> None:
     )
     assert total_success == 1
     assert success_logs[0].status == "success"
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+
+    async def get(self, key: str):
+        return self.store.get(key)
+
+    async def setex(self, key: str, ttl: int, value: int) -> None:
+        self.store[key] = str(value)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.keys: list[str] = []
+
+    def incr(self, key: str) -> None:
+        self.keys.append(key)
+
+    async def execute(self) -> list[int]:
+        results = []
+        for key in self.keys:
+            value = int(self.redis.store.get(key, 0)) + 1
+            self.redis.store[key] = str(value)
+            results.append(value)
+        return results
+
+
+async def test_list_topics_uses_cached_total(
+    session: AsyncSessionWrapper, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(crud, "redis_client", fake_redis)
+    monkeypatch.setattr(crud.settings, "count_cache_ttl", 30)
+
+    session.add_all(
+        [
+            models.Topic(
+                name=f"Topic {i}",
+                source="v2ex",
+                feed_url=f"https://example.com/rss{i}",
+                keywords=[],
+                is_active=True,
+            )
+            for i in range(3)
+        ]
+    )
+    await session.commit()
+
+    _, total = await crud.list_topics(session, skip=0, limit=2)
+    assert total == 3
+    key = await crud.count_cache_key("topics")
+    assert fake_redis.store[key] == "3"
+
+    fake_redis.store[key] = "10"
+    _, cached_total = await crud.list_topics(session, skip=0, limit=2)
+    assert cached_total == 10
+
+    # A short page reports its exact size instead of the cached total.
+    _, exact_total = await crud.list_topics(session, skip=0, limit=10)
+    assert exact_total == 3
+
+    await crud.create_topic(
+        session,
+        schemas.TopicCreate(
+            name="Topic 3", source="v2ex", feed_url="https://example.com/rss3"
+        ),
+    )
+    assert await crud.count_cache_key("topics") != key
+
+
+async def test_update_topic_source_invalidates_post_counts(
+    session: AsyncSessionWrapper, seeded_posts, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(crud, "redis_client", fake_redis)
+    monkeypatch.setattr(crud.settings, "count_cache_ttl", 30)
+    (topic_v2ex, _), _ = seeded_posts
+
+    _, total = await crud.list_posts(session, skip=0, limit=1, source="v2ex")
+    assert total == 2
+    key = await crud.count_cache_key("posts", source="v2ex")
+    assert key in fake_redis.store
+
+    await crud.update_topic(session, topic_v2ex, schemas.TopicUpdate(is_active=False))
+    assert await crud.count_cache_key("posts", source="v2ex") == key
+
+    await crud.update_topic(session, topic_v2ex, schemas.TopicUpdate(source="linux.do"))
+    assert await crud.count_cache_key("posts", source="v2ex") != key
+
+
+async def test_list_posts_keyset_cursor(session: AsyncSessionWrapper) -> None:
+    base_time = NOW
+    topic = models.Topic(
+        name="V2EX Hot",
+        source="v2ex",
+        feed_url="https://www.v2ex.com/rss",
+        keywords=[],
+        is_active=True,
+    )
+    session.add(topic)
+    await session.flush()
+
+    session.add_all(
+        [
+            models.Post(
+                topic_id=topic.id,
+                title=f"Post {i}",
+                link=f"https://www.v2ex.com/t/{i}",
+                uid=f"v2ex:{i}",
+                published_at=base_time,
+                created_at=base_time + timedelta(minutes=i),
+            )
+            for i in range(5)
+        ]
+    )
+    await session.commit()
+
+    first_page, total = await crud.list_posts(session, skip=0, limit=2)
+    assert total == 5
+    assert [post.uid for post in first_page] == ["v2ex:4", "v2ex:3"]
+
+    cursor = crud.decode_cursor(
+        crud.encode_cursor(first_page[-1].created_at, first_page[-1].id)
+    )
+    second_page, total_after_cursor = await crud.list_posts(
+        session, limit=2, cursor=cursor
+    )
+    assert total_after_cursor == 5
+    assert [post.uid for post in second_page] == ["v2ex:2", "v2ex:1"]
+
+    with pytest.raises(ValueError):
+        crud.decode_cursor("not-a-cursor")
@@ -2,82 +2,47 @@
 from __future__ import annotations
 
 import time
-from types import SimpleNamespace
 
 import httpx
 import pytest
 
 from app import fetchers
-
-
-@pytest.mark.asyncio
-async def test_fetch_feed_with_all_sources(monkeypatch: pytest.MonkeyPatch) -> None:
-    """Test that all supported sources can be fetched."""
-    sample_entry = {
-        "title": "Test Post",
-        "link": "https://example.com/post",
-        "summary": "Test content",
-        "id": "test-guid",
-        "published_parsed": time.gmtime(0),
-    }
-
-    async def fake_fetch_and_parse(url: str):
-        return SimpleNamespace(entries=[sample_entry])
-
-    monkeypatch.setattr(fetchers, "_fetch_and_parse", fake_fetch_and_parse)
-
-    # Test v2ex
-    results = await fetchers.fetch_v2ex_feed("https://v2ex.com/rss")
-    assert len(results) == 1
-    assert results[0]["title"] == "Test Post"
-
-    # Test nodeseek
-    results = await fetchers.fetch_nodeseek_feed("https://nodeseek.com/rss")
-    assert len(results) == 1
-    assert results[0]["title"] == "Test Post"
-
-    # Test linux.do
-    results = await fetchers.fetch_linux_do_feed("https://linux.do/rss")
+from .conftest import SAMPLE_ENTRY
+
+
+@pytest.mark.parametrize(
+    "caller",
+    [
+        ("direct", fetchers.fetch_v2ex_feed),
+        ("direct", fetchers.fetch_nodeseek_feed),
+        ("direct", fetchers.fetch_linux_do_feed),
+        ("factory", "v2ex"),
+        ("factory", "nodeseek"),
+        ("factory", "linux.do"),
+    ],
+)
+async def test_fetch_feed_with_all_sources(fake_feed: list, caller: tuple) -> None:
+    """Test every source, both directly and through the fetch_feed factory."""
+    fake_feed.append(dict(SAMPLE_ENTRY))
+
+    style, target = caller
+    if style == "direct":
+        results = await target("https://example.com/rss")
+    else:
+        results = await fetchers.fetch_feed(target, "https://example.com/rss")
     assert len(results) == 1
     assert results[0]["title"] == "Test Post"
 
 
-@pytest.mark.asyncio
-async def test_fetch_feed_factory_function(monkeypatch: pytest.MonkeyPatch) -> None:
-    """Test the fetch_feed factory function with different sources."""
-    sample_entry = {
-        "title": "Factory Test",
-        "link": "https://example.com/post",
-        "summary": "Content",
-        "id": "factory-guid",
-        "published_parsed": time.gmtime(0),
-    }
-
-    async def fake_fetch_and_parse(url: str):
-        return SimpleNamespace(entries=[sample_entry])
-
-    monkeypatch.setattr(fetchers, "_fetch_and_parse", fake_fetch_and_parse)
-
-    # Test all sources via factory
-    for source in ["v2ex", "nodeseek", "linux.do"]:
-        results = await fetchers.fetch_feed(source, f"https://{source}.com/rss")
-        assert len(results) == 1
-        assert results[0]["title"] == "Factory Test"
-
-
-@pytest.mark.asyncio
-async def test_fetch_feed_with_missing_fields(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_fetch_feed_with_missing_fields(fake_feed: list) -> None:
     """Test handling of entries with missing fields."""
     # Entry with minimal fields
-    minimal_entry = {
-        "title": "Minimal Post",
-        # No link, id, summary, or published_parsed
-    }
-
-    async def fake_fetch_and_parse(url: str):
-        return SimpleNamespace(entries=[minimal_entry])
-
-    monkeypatch.setattr(fetchers, "_fetch_and_parse", fake_fetch_and_parse)
+    fake_feed.append(
+        {
+            "title": "Minimal Post",
+            # No link, id, summary, or published_parsed
+        }
+    )
 
     results = await fetchers.fetch_v2ex_feed("https://example.com/rss")
     assert len(results) == 1
@@ -90,86 +55,62 @@ async def test_fetch_feed_with_missing_fields(monkeypatch: pytest.MonkeyPatch) -
     assert results[0]["published_at"] is not None
 
 
-@pytest.mark.asyncio
-async def test_fetch_feed_with_content_field(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_fetch_feed_with_content_field(fake_feed: list) -> None:
     """Test handling of entries with content field instead of summary."""
-    entry_with_content = {
-        "title": "Content Field Post",
-        "link": "https://example.com/post",
-        "content": [{"value": "Content from content field"}],
-        "id": "content-guid",
-        "published_parsed": time.gmtime(0),
-    }
-
-    async def fake_fetch_and_parse(url: str):
-        return SimpleNamespace(entries=[entry_with_content])
-
-    monkeypatch.setattr(fetchers, "_fetch_and_parse", fake_fetch_and_parse)
+    fake_feed.append(
+        {
+            **SAMPLE_ENTRY,
+            "summary": None,
+            "content": [{"value": "Content from content field"}],
+            "id": "content-guid",
+        }
+    )
 
     results = await fetchers.fetch_v2ex_feed("https://example.com/rss")
     assert len(results) == 1
     assert results[0]["summary"] == "Content from content field"
 
 
-@pytest.mark.asyncio
-async def test_fetch_feed_with_alternative_date_fields(
-    monkeypatch: pytest.MonkeyPatch,
-) -> None:
+async def test_fetch_feed_with_alternative_date_fields(fake_feed: list) -> None:
     """Test handling of entries with alternative date fields."""
     # Entry with updated_parsed instead of published_parsed
-    entry_updated = {
-        "title": "Updated Post",
-        "link": "https://example.com/post",
-        "id": "updated-guid",
-        "updated_parsed": time.gmtime(1000000),
-    }
-
-    async def fake_fetch_and_parse(url: str):
-        return SimpleNamespace(entries=[entry_updated])
-
-    monkeypatch.setattr(fetchers, "_fetch_and_parse", fake_fetch_and_parse)
+    fake_feed.append(
+        {
+            "title": "Updated Post",
+            "link": "https://example.com/post",
+            "id": "updated-guid",
+            "updated_parsed": time.gmtime(1000000),
+        }
+    )
 
     results = await fetchers.fetch_v2ex_feed("https://example.com/rss")
     assert len(results) == 1
     assert results[0]["published_at"] is not None
 
 
-@pytest.mark.asyncio
-async def test_fetch_feed_with_empty_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_fetch_feed_with_empty_entries(fake_feed: list) -> None:
     """Test handling of feed with no entries."""
-
-    async def fake_fetch_and_parse(url: str):
-        return SimpleNamespace(entries=[])
-
-    monkeypatch.setattr(fetchers, "_fetch_and_parse", fake_fetch_and_parse)
-
     results = await fetchers.fetch_v2ex_feed("https://example.com/rss")
     assert len(results) == 0
 
 
-@pytest.mark.asyncio
-async def test_fetch_feed_with_multiple_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_fetch_feed_with_multiple_entries(fake_feed: list) -> None:
     """Test handling of feed with multiple entries."""
-    entries = [
+    fake_feed.extend(
         {
+            **SAMPLE_ENTRY,
             "title": f"Post {i}",
             "link": f"https://example.com/post{i}",
             "id": f"guid-{i}",
             "published_parsed": time.gmtime(i * 1000),
         }
         for i in range(10)
-    ]
-
-    async def fake_fetch_and_parse(url: str):
-        return SimpleNamespace(entries=entries)
-
-    monkeypatch.setattr(fetchers, "_fetch_and_parse", fake_fetch_and_parse)
+    )
 
     results = await fetchers.fetch_v2ex_feed("https://example.com/rss")
     assert len(results) == 10
-    for i, result in enumerate(results):
-        assert result["title"] == f"Post {i}"
-        assert result["uid"] == f"guid-{i}"
+    assert [result["title"] for result in results] == [f"Post {i}" for i in range(10)]
+    assert [result["uid"] for result in results] == [f"guid-{i}" for i in range(10)]
 
 
 def test_match_keywords_edge_cases() -> None:
@@ -198,11 +139,10 @@ def test_match_keywords_edge_cases() -> None:
     assert fetchers.match_keywords("   ", ["python"]) is False
 
 
-@pytest.mark.asyncio
 async def test_fetch_feed_network_error(monkeypatch: pytest.MonkeyPatch) -> None:
     """Test handling of network errors during fetch."""
 
-    async def fake_fetch_and_parse_error(url: str):
+    async def fake_fetch_and_parse_error(url: str, validators=None):
         raise httpx.HTTPError("Network error")
 
     monkeypatch.setattr(fetchers, "_fetch_and_parse", fake_fetch_and_parse_error)
@@ -211,35 +151,18 @@ async def test_fetch_feed_network_error(monkeypatch: pytest.MonkeyPatch) -> None
         await fetchers.fetch_v2ex_feed("https://example.com/rss")
 
 
-@pytest.mark.asyncio
+@pytest.mark.parametrize("source", ["V2EX", "NodeSeek", "LINUX.DO"])
 async def test_fetch_feed_case_insensitive_source(
-    monkeypatch: pytest.MonkeyPatch,
+    monkeypatch: pytest.MonkeyPatch, source: str
 ) -> None:
     """Test that source matching is case insensitive."""
-    from app.fetchers import fetch_feed
-
-    async def fake_v2ex_feed(url: str):
-        return []
-
-    async def fake_nodeseek_feed(url: str):
-        return []
 
-    async def fake_linux_do_feed(url: str):
+    async def fake_fetcher(url: str, validators=None):
         return []
 
-    monkeypatch.setattr(fetchers, "fetch_v2ex_feed", fake_v2ex_feed)
-    monkeypatch.setattr(fetchers, "fetch_nodeseek_feed", fake_nodeseek_feed)
-    monkeypatch.setattr(fetchers, "fetch_linux_do_feed", fake_linux_do_feed)
+    monkeypatch.setitem(fetchers._FETCHERS, source.lower(), fake_fetcher)
 
-    # These should not raise errors
-    result = await fetch_feed("V2EX", "https://example.com/rss")
-    assert result == []
-
-    result = await fetch_feed("NodeSeek", "https://example.com/rss")
-    assert result == []
-
-    result = await fetch_feed("LINUX.DO", "https://example.com/rss")
-    assert result == []
+    assert await fetchers.fetch_feed(source, "https://example.com/rss") == []
 
 
 def test_match_keywords_with_unicode() -> None:
@@ -250,3 +173,36 @@ def test_match_keywords_with_unicode() -> None:
 
     # Test with emoji
     assert fetchers.match_keywords("🐍 Python programming", ["python"]) is True
+
+
+async def test_fetch_feed_conditional_get(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that cache validators are sent and a 304 skips parsing."""
+    body = (
+        b'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>'
+        b"<item><title>Post</title><link>https://example.com/post</link>"
+        b"<guid>guid-1</guid></item></channel></rss>"
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            content=body,
+            headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(fetchers, "_get_client", lambda: client)
+
+    validators = {"etag": None, "last_modified": None}
+    results = await fetchers.fetch_feed("v2ex", "https://example.com/rss", validators)
+    assert [entry["uid"] for entry in results] == ["guid-1"]
+    assert validators == {
+        "etag": '"v1"',
+        "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+
+    unchanged = await fetchers.fetch_feed("v2ex", "https://example.com/rss", validators)
+    assert unchanged is None
+    await client.aclose()
@@ -1,16 +1,17 @@
 """Integration tests for the complete workflow."""
 from __future__ import annotations
 
-from datetime import datetime, timezone
-
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
 
+from app import tasks
+from app.fetchers import match_keywords
 from app.models import Post, PushLog, Topic
-from .conftest import AsyncSessionWrapper
+from .conftest import AsyncSessionWrapper, NOW, jloads
 
 
-@pytest.mark.asyncio
 async def test_complete_workflow(
     client: AsyncClient, session: AsyncSessionWrapper
 ) -> None:
@@ -27,7 +28,7 @@ async def test_complete_workflow(
         },
     )
     assert topic_response.status_code == 201
-    topic_data = topic_response.json()
+    topic_data = jloads(topic_response)
     topic_id = topic_data["id"]
 
     # Step 2: Verify the topic was created
@@ -41,7 +42,7 @@ async def test_complete_workflow(
         content="This is a test post with python keyword",
         link="https://example.com/post1",
         uid="v2ex:integration:1",
-        published_at=datetime.now(timezone.utc),
+        published_at=NOW,
     )
     session.add(post)
     await session.flush()
@@ -54,21 +55,21 @@ async def test_complete_workflow(
     # Step 5: Verify posts can be listed
     posts_response = await client.get(f"/api/v1/posts?topic_id={topic_id}")
     assert posts_response.status_code == 200
-    posts_data = posts_response.json()
+    posts_data = jloads(posts_response)
     assert posts_data["total"] == 1
     assert posts_data["items"][0]["title"] == "Integration Test Post"
 
     # Step 6: Verify logs can be listed
     logs_response = await client.get("/api/v1/logs")
     assert logs_response.status_code == 200
-    logs_data = logs_response.json()
+    logs_data = jloads(logs_response)
     assert logs_data["total"] == 1
     assert logs_data["items"][0]["status"] == "pending"
 
     # Step 7: Verify system stats are updated
     stats_response = await client.get("/api/v1/system/stats")
     assert stats_response.status_code == 200
-    stats_data = stats_response.json()
+    stats_data = jloads(stats_response)
     assert stats_data["topics_total"] == 1
     assert stats_data["active_topics"] == 1
     assert stats_data["posts_total"] == 1
@@ -82,94 +83,86 @@ async def test_complete_workflow(
     assert update_response.status_code == 200
 
     # Step 9: Verify active topics count decreased
-    stats_response = await client.get("/api/v1/system/stats")
-    stats_data = stats_response.json()
-    assert stats_data["active_topics"] == 0
-    assert stats_data["topics_total"] == 1
+    active_topics, topics_total = (
+        await session.execute(
+            select(
+                func.count().filter(Topic.is_active.is_(True)),
+                func.count(),
+            ).select_from(Topic)
+        )
+    ).one()
+    assert active_topics == 0
+    assert topics_total == 1
 
     # Step 10: Delete the topic
     delete_response = await client.delete(f"/api/v1/topics/{topic_id}")
     assert delete_response.status_code == 204
 
 
-@pytest.mark.asyncio
 async def test_multiple_topics_with_different_sources(
-    client: AsyncClient, session: AsyncSessionWrapper
+    client: AsyncClient, session: AsyncSessionWrapper, make_topics
 ) -> None:
     """Test creating multiple topics from different sources."""
     sources = ["v2ex", "nodeseek", "linux.do"]
-    topic_ids = []
 
     # Create topics for each source
-    for source in sources:
-        response = await client.post(
-            "/api/v1/topics",
-            json={
+    topic_ids = await make_topics(
+        [
+            {
                 "name": f"{source.title()} Topic",
                 "source": source,
                 "feed_url": f"https://{source}.com/rss",
                 "keywords": ["test"],
-                "is_active": True,
-            },
-        )
-        assert response.status_code == 201
-        topic_ids.append(response.json()["id"])
+            }
+            for source in sources
+        ]
+    )
 
     # Add posts for each topic
-    for idx, topic_id in enumerate(topic_ids):
-        post = Post(
-            topic_id=topic_id,
-            title=f"Post from {sources[idx]}",
-            content="Test content",
-            link=f"https://{sources[idx]}.com/post",
-            uid=f"{sources[idx]}:test:1",
-            published_at=datetime.now(timezone.utc),
-        )
-        session.add(post)
+    await session.execute(
+        insert(Post),
+        [
+            {
+                "topic_id": topic_id,
+                "title": f"Post from {source}",
+                "content": "Test content",
+                "link": f"https://{source}.com/post",
+                "uid": f"{source}:test:1",
+                "published_at": NOW,
+            }
+            for topic_id, source in zip(topic_ids, sources)
+        ],
+    )
     await session.commit()
 
     # Filter posts by each source
     for source in sources:
         response = await client.get(f"/api/v1/posts?source={source}")
         assert response.status_code == 200
-        data = response.json()
+        data = jloads(response)
         assert data["total"] == 1
         assert source in data["items"][0]["title"].lower()
 
 
-@pytest.mark.asyncio
-async def test_keyword_filtering_in_posts(session: AsyncSessionWrapper) -> None:
+@pytest.mark.parametrize(
+    "text,keywords,expected",
+    [
+        ("Python programming guide", ["python"], True),  # exact match
+        ("PYTHON Programming", ["python"], True),  # case insensitive
+        ("FastAPI tutorial", ["python", "fastapi"], True),  # any keyword matches
+        ("JavaScript tutorial", ["python"], False),  # no match
+        ("Any content", [], True),  # empty keywords match everything
+        (None, ["python"], False),  # no text
+        ("", ["python"], False),  # empty text
+        ("FastAPI Framework Python async web framework", ["fastapi", "django"], True),
+    ],
+)
+def test_keyword_filtering_in_posts(text, keywords, expected: bool) -> None:
     """Test that keyword filtering works correctly."""
-    from app.fetchers import match_keywords
-
-    # Test exact match
-    assert match_keywords("Python programming guide", ["python"]) is True
-
-    # Test case insensitive
-    assert match_keywords("PYTHON Programming", ["python"]) is True
-
-    # Test multiple keywords (any match)
-    assert match_keywords("FastAPI tutorial", ["python", "fastapi"]) is True
-
-    # Test no match
-    assert match_keywords("JavaScript tutorial", ["python"]) is False
+    assert match_keywords(text, keywords) is expected
 
-    # Test empty keywords (should match everything)
-    assert match_keywords("Any content", []) is True
 
-    # Test None text with keywords
-    assert match_keywords(None, ["python"]) is False
-
-    # Test empty text
-    assert match_keywords("", ["python"]) is False
-
-    # Test keyword in title or summary
-    combined_text = "FastAPI Framework Python async web framework"
-    assert match_keywords(combined_text, ["fastapi", "django"]) is True
-
-
-@pytest.mark.asyncio
-async def test_post_deduplication(session: AsyncSessionWrapper) -> None:
+def test_post_deduplication(sync_session: Session) -> None:
     """Test that posts with duplicate UIDs are not created."""
     topic = Topic(
         name="Dedup Test Topic",
@@ -178,8 +171,8 @@ async def test_post_deduplication(session: AsyncSessionWrapper) -> None:
         keywords=["test"],
         is_active=True,
     )
-    session.add(topic)
-    await session.flush()
+    sync_session.add(topic)
+    sync_session.flush()
 
     # Add first post
     post1 = Post(
@@ -188,24 +181,47 @@ async def test_post_deduplication(session: AsyncSessionWrapper) -> None:
         content="Content",
         link="https://example.com/post1",
         uid="v2ex:unique:1",
-        published_at=datetime.now(timezone.utc),
+        published_at=NOW,
     )
-    session.add(post1)
-    await session.commit()
-
-    # Try to add duplicate post (same UID)
-    from sqlalchemy.exc import IntegrityError
-
-    post2 = Post(
-        topic_id=topic.id,
-        title="Duplicate Post",
-        content="Different content",
-        link="https://example.com/post2",
-        uid="v2ex:unique:1",  # Same UID
-        published_at=datetime.now(timezone.utc),
-    )
-    session.add(post2)
-
-    # Should raise IntegrityError due to unique constraint
-    with pytest.raises(IntegrityError):
-        await session.commit()
+    sync_session.add(post1)
+    sync_session.commit()
+
+    # Feed the crawler's storage path a duplicate alongside a fresh entry
+    entries = [
+        {
+            "title": "Duplicate test post",
+            "summary": "Different content",
+            "link": "https://example.com/post2",
+            "uid": "v2ex:unique:1",  # Same UID
+            "published_at": NOW,
+        },
+        {
+            "title": "Second test post",
+            "summary": "Content",
+            "link": "https://example.com/post3",
+            "uid": "v2ex:unique:2",
+            "published_at": NOW,
+        },
+    ]
+    assert tasks._store_entries(sync_session, topic, entries) == (1, 1)
+
+    # A UID stored concurrently is skipped by ON CONFLICT instead of raising
+    assert tasks._insert_posts(
+        sync_session,
+        [
+            {
+                "topic_id": topic.id,
+                "title": "Racing Post",
+                "content": None,
+                "link": "https://example.com/post4",
+                "uid": "v2ex:unique:2",
+                "published_at": NOW,
+            }
+        ],
+    ) == []
+    sync_session.commit()
+
+    assert sync_session.scalars(select(Post.title).order_by(Post.id)).all() == [
+        "First Post",
+        "Second test post",
+    ]
@@ -1,49 +1,27 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-
 import pytest
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import select
 
 from app import models, tasks
-
-
-@pytest.fixture
-def task_session_factory(monkeypatch: pytest.MonkeyPatch):
-    engine = create_engine(
-        "sqlite://",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        future=True,
-    )
-    models.Base.metadata.create_all(bind=engine)
-
-    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False, future=True)
-    monkeypatch.setattr(tasks, "SessionLocal", SessionLocal)
-
-    yield SessionLocal
-
-    models.Base.metadata.drop_all(bind=engine)
+from .conftest import NOW
 
 
 def _sample_entries():
-    now = datetime.now(timezone.utc)
     return [
         {
             "title": "Python release",
             "link": "https://example.com/python",
             "summary": "Python and FastAPI updates",
             "uid": "v2ex:https://example.com/python",
-            "published_at": now,
+            "published_at": NOW,
         },
         {
             "title": "Unrelated",
             "link": "https://example.com/other",
             "summary": "Random news",
             "uid": "v2ex:https://example.com/other",
-            "published_at": now,
+            "published_at": NOW,
         },
     ]
 
@@ -53,7 +31,7 @@ def test_fetch_all_topics_creates_posts_and_logs(
 ) -> None:
     entries = _sample_entries()
 
-    async def fake_fetch_feed(source: str, feed_url: str):
+    async def fake_fetch_feed(source: str, feed_url: str, validators=None):
         assert source == "v2ex"
         return entries
 
@@ -69,12 +47,11 @@ def test_fetch_all_topics_creates_posts_and_logs(
     )
     session.add(topic)
     session.commit()
-    session.close()
 
     stats = tasks.fetch_all_topics()
     assert stats == {"topics_checked": 1, "posts_created": 1, "duplicates": 0}
 
-    session = task_session_factory()
+    session.expire_all()
     posts = session.execute(select(models.Post)).scalars().all()
     assert len(posts) == 1
     assert posts[0].uid == "v2ex:https://example.com/python"
@@ -1,33 +1,14 @@
 """Enhanced tasks tests including edge cases and error handling."""
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import timezone
 
+import httpx
 import pytest
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import insert, select
 
 from app import models, tasks
-
-
-@pytest.fixture
-def task_session_factory(monkeypatch: pytest.MonkeyPatch):
-    """Create a test database session factory for tasks."""
-    engine = create_engine(
-        "sqlite://",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        future=True,
-    )
-    models.Base.metadata.create_all(bind=engine)
-
-    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False, future=True)
-    monkeypatch.setattr(tasks, "SessionLocal", SessionLocal)
-
-    yield SessionLocal
-
-    models.Base.metadata.drop_all(bind=engine)
+from .conftest import NOW
 
 
 def test_fetch_all_topics_with_no_active_topics(
@@ -64,11 +45,11 @@ def test_fetch_all_topics_with_no_matching_keywords(
             "link": "https://example.com/js",
             "summary": "Learn JavaScript",
             "uid": "v2ex:js:1",
-            "published_at": datetime.now(timezone.utc),
+            "published_at": NOW,
         },
     ]
 
-    async def fake_fetch_feed(source: str, feed_url: str):
+    async def fake_fetch_feed(source: str, feed_url: str, validators=None):
         return entries
 
     monkeypatch.setattr(tasks, "fetch_feed", fake_fetch_feed)
@@ -101,11 +82,11 @@ def test_fetch_all_topics_with_empty_keywords(
             "link": "https://example.com/any",
             "summary": "Any content",
             "uid": "v2ex:any:1",
-            "published_at": datetime.now(timezone.utc),
+            "published_at": NOW,
         },
     ]
 
-    async def fake_fetch_feed(source: str, feed_url: str):
+    async def fake_fetch_feed(source: str, feed_url: str, validators=None):
         return entries
 
     monkeypatch.setattr(tasks, "fetch_feed", fake_fetch_feed)
@@ -131,32 +112,31 @@ def test_fetch_all_topics_with_multiple_entries(
     task_session_factory, monkeypatch: pytest.MonkeyPatch
 ) -> None:
     """Test fetch_all_topics with multiple entries, some matching."""
-    now = datetime.now(timezone.utc)
     entries = [
         {
             "title": "Python Tutorial",
             "link": "https://example.com/python",
             "summary": "Learn Python",
             "uid": "v2ex:python:1",
-            "published_at": now,
+            "published_at": NOW,
         },
         {
             "title": "JavaScript Guide",
             "link": "https://example.com/js",
             "summary": "Learn JS",
             "uid": "v2ex:js:1",
-            "published_at": now,
+            "published_at": NOW,
         },
         {
             "title": "FastAPI Framework",
             "link": "https://example.com/fastapi",
             "summary": "Python FastAPI",
             "uid": "v2ex:fastapi:1",
-            "published_at": now,
+            "published_at": NOW,
         },
     ]
 
-    async def fake_fetch_feed(source: str, feed_url: str):
+    async def fake_fetch_feed(source: str, feed_url: str, validators=None):
         return entries
 
     monkeypatch.setattr(tasks, "fetch_feed", fake_fetch_feed)
@@ -171,13 +151,20 @@ def test_fetch_all_topics_with_multiple_entries(
     )
     session.add(topic)
     session.commit()
-    session.close()
 
     stats = tasks.fetch_all_topics()
     assert stats["topics_checked"] == 1
     assert stats["posts_created"] == 2  # Python Tutorial and FastAPI Framework
     assert stats["duplicates"] == 0
 
+    # The bulk insert pairs every new post with exactly one pending log
+    session.expire_all()
+    post_ids = session.execute(select(models.Post.id)).scalars().all()
+    logs = session.execute(select(models.PushLog)).scalars().all()
+    assert sorted(log.post_id for log in logs) == sorted(post_ids)
+    assert {log.status for log in logs} == {"pending"}
+    session.close()
+
 
 def test_fetch_all_topics_creates_push_logs(
     task_session_factory, monkeypatch: pytest.MonkeyPatch
@@ -189,11 +176,11 @@ def test_fetch_all_topics_creates_push_logs(
             "link": "https://example.com/post",
             "summary": "Test content",
             "uid": "v2ex:test:1",
-            "published_at": datetime.now(timezone.utc),
+            "published_at": NOW,
         },
     ]
 
-    async def fake_fetch_feed(source: str, feed_url: str):
+    async def fake_fetch_feed(source: str, feed_url: str, validators=None):
         return entries
 
     monkeypatch.setattr(tasks, "fetch_feed", fake_fetch_feed)
@@ -208,12 +195,11 @@ def test_fetch_all_topics_creates_push_logs(
     )
     session.add(topic)
     session.commit()
-    session.close()
 
     tasks.fetch_all_topics()
 
     # Verify push log was created
-    session = task_session_factory()
+    session.expire_all()
     logs = session.execute(select(models.PushLog)).scalars().all()
     assert len(logs) == 1
     assert logs[0].status == "pending"
@@ -230,7 +216,7 @@ def test_fetch_all_topics_with_multiple_active_topics(
             "link": "https://v2ex.com/post",
             "summary": "V2EX content",
             "uid": "v2ex:post:1",
-            "published_at": datetime.now(timezone.utc),
+            "published_at": NOW,
         },
     ]
 
@@ -240,13 +226,13 @@ def test_fetch_all_topics_with_multiple_active_topics(
             "link": "https://nodeseek.com/post",
             "summary": "NodeSeek content",
             "uid": "nodeseek:post:1",
-            "published_at": datetime.now(timezone.utc),
+            "published_at": NOW,
         },
     ]
 
     call_count = {"v2ex": 0, "nodeseek": 0}
 
-    async def fake_fetch_feed(source: str, feed_url: str):
+    async def fake_fetch_feed(source: str, feed_url: str, validators=None):
         call_count[source] += 1
         if source == "v2ex":
             return v2ex_entries
@@ -254,24 +240,27 @@ def test_fetch_all_topics_with_multiple_active_topics(
 
     monkeypatch.setattr(tasks, "fetch_feed", fake_fetch_feed)
 
-    session = task_session_factory()
-    topic1 = models.Topic(
-        name="V2EX Topic",
-        source="v2ex",
-        feed_url="https://v2ex.com/rss",
-        keywords=[],
-        is_active=True,
-    )
-    topic2 = models.Topic(
-        name="NodeSeek Topic",
-        source="nodeseek",
-        feed_url="https://nodeseek.com/rss",
-        keywords=[],
-        is_active=True,
-    )
-    session.add_all([topic1, topic2])
-    session.commit()
-    session.close()
+    with task_session_factory() as session:
+        session.execute(
+            insert(models.Topic),
+            [
+                {
+                    "name": "V2EX Topic",
+                    "source": "v2ex",
+                    "feed_url": "https://v2ex.com/rss",
+                    "keywords": [],
+                    "is_active": True,
+                },
+                {
+                    "name": "NodeSeek Topic",
+                    "source": "nodeseek",
+                    "feed_url": "https://nodeseek.com/rss",
+                    "keywords": [],
+                    "is_active": True,
+                },
+            ],
+        )
+        session.commit()
 
     stats = tasks.fetch_all_topics()
     assert stats["topics_checked"] == 2
@@ -280,39 +269,34 @@ def test_fetch_all_topics_with_multiple_active_topics(
     assert call_count["nodeseek"] == 1
 
 
-def test_should_keep_entry_with_various_inputs() -> None:
+@pytest.mark.parametrize(
+    "entry,keywords,expected",
+    [
+        ({"title": "Python Tutorial", "summary": "Learn programming"}, ["python"], True),
+        ({"title": "Tutorial", "summary": "Learn Python programming"}, ["python"], True),
+        ({"title": "Web Framework", "summary": "FastAPI is great"}, ["fastapi"], True),
+        ({"title": "JavaScript", "summary": "Node.js tutorial"}, ["python"], False),
+        ({"title": "Any Topic", "summary": "Any content"}, [], True),
+        ({"title": "Any Topic", "summary": "Any content"}, None, True),
+        ({"title": None, "summary": None}, ["python"], False),
+    ],
+    ids=[
+        "title",
+        "summary",
+        "combined",
+        "no-match",
+        "empty-keywords",
+        "none-keywords",
+        "missing-fields",
+    ],
+)
+def test_should_keep_entry_with_various_inputs(entry, keywords, expected: bool) -> None:
     """Test _should_keep_entry helper function."""
-    # Match in title
-    entry = {"title": "Python Tutorial", "summary": "Learn programming"}
-    assert tasks._should_keep_entry(entry, ["python"]) is True
-
-    # Match in summary
-    entry = {"title": "Tutorial", "summary": "Learn Python programming"}
-    assert tasks._should_keep_entry(entry, ["python"]) is True
-
-    # Match in combined text
-    entry = {"title": "Web Framework", "summary": "FastAPI is great"}
-    assert tasks._should_keep_entry(entry, ["fastapi"]) is True
-
-    # No match
-    entry = {"title": "JavaScript", "summary": "Node.js tutorial"}
-    assert tasks._should_keep_entry(entry, ["python"]) is False
-
-    # Empty keywords (match all)
-    entry = {"title": "Any Topic", "summary": "Any content"}
-    assert tasks._should_keep_entry(entry, []) is True
-
-    # None keywords (match all)
-    entry = {"title": "Any Topic", "summary": "Any content"}
-    assert tasks._should_keep_entry(entry, None) is True
+    assert tasks._should_keep_entry(entry, keywords) is expected
 
-    # Missing fields
-    entry = {"title": None, "summary": None}
-    assert tasks._should_keep_entry(entry, ["python"]) is False
 
-
-def test_uid_exists_check(task_session_factory) -> None:
-    """Test _uid_exists helper function."""
+def test_existing_uids_check(task_session_factory) -> None:
+    """Test _existing_uids helper function."""
     session = task_session_factory()
 
     # Create a topic and post
@@ -332,15 +316,209 @@ def test_uid_exists_check(task_session_factory) -> None:
         content="Content",
         link="https://example.com/post",
         uid="v2ex:exists:1",
-        published_at=datetime.now(timezone.utc),
+        published_at=NOW,
     )
     session.add(post)
     session.commit()
 
-    # Test existing UID
-    assert tasks._uid_exists(session, "v2ex:exists:1") is True
+    # Only the stored UID of the batch comes back
+    assert tasks._existing_uids(session, ["v2ex:exists:1", "v2ex:notexists:1"]) == {
+        "v2ex:exists:1"
+    }
 
-    # Test non-existing UID
-    assert tasks._uid_exists(session, "v2ex:notexists:1") is False
+    # An empty batch skips the query
+    assert tasks._existing_uids(session, []) == set()
 
     session.close()
+
+
+def test_fetch_all_topics_skips_failed_feeds(
+    task_session_factory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that one failing feed does not stop the other topics."""
+    entries = [
+        {
+            "title": "NodeSeek Post",
+            "link": "https://nodeseek.com/post",
+            "summary": "NodeSeek content",
+            "uid": "nodeseek:post:1",
+            "published_at": NOW,
+        },
+    ]
+
+    async def fake_fetch_feed(source: str, feed_url: str, validators=None):
+        if source == "v2ex":
+            raise httpx.HTTPError("Network error")
+        return entries
+
+    monkeypatch.setattr(tasks, "fetch_feed", fake_fetch_feed)
+
+    session = task_session_factory()
+    session.add_all(
+        [
+            models.Topic(
+                name="V2EX Topic",
+                source="v2ex",
+                feed_url="https://v2ex.com/rss",
+                keywords=[],
+                is_active=True,
+            ),
+            models.Topic(
+                name="NodeSeek Topic",
+                source="nodeseek",
+                feed_url="https://nodeseek.com/rss",
+                keywords=[],
+                is_active=True,
+            ),
+        ]
+    )
+    session.commit()
+    session.close()
+
+    stats = tasks.fetch_all_topics()
+    assert stats["topics_checked"] == 2
+    assert stats["posts_created"] == 1
+
+
+def test_fetch_all_topics_stores_feed_validators(
+    task_session_factory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that cache validators persist and unchanged feeds are skipped."""
+    entries = [
+        {
+            "title": "Test Post",
+            "link": "https://example.com/post",
+            "summary": "Test content",
+            "uid": "v2ex:test:1",
+            "published_at": NOW,
+        },
+    ]
+    seen_validators = []
+
+    async def fake_fetch_feed(source: str, feed_url: str, validators=None):
+        seen_validators.append(dict(validators))
+        if validators["etag"] == '"v1"':
+            return None
+        validators["etag"] = '"v1"'
+        return entries
+
+    monkeypatch.setattr(tasks, "fetch_feed", fake_fetch_feed)
+
+    session = task_session_factory()
+    session.add(
+        models.Topic(
+            name="Test Topic",
+            source="v2ex",
+            feed_url="https://example.com/rss",
+            keywords=[],
+            is_active=True,
+        )
+    )
+    session.commit()
+    session.close()
+
+    first = tasks.fetch_all_topics()
+    assert first["posts_created"] == 1
+
+    second = tasks.fetch_all_topics()
+    assert second["posts_created"] == 0
+    assert second["duplicates"] == 0
+    assert seen_validators == [
+        {"etag": None, "last_modified": None},
+        {"etag": '"v1"', "last_modified": None},
+    ]
+
+
+
+def test_fetch_all_topics_keeps_topic_updated_at(
+    task_session_factory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that storing new feed validators is not reported as a topic edit."""
+
+    async def fake_fetch_feed(source: str, feed_url: str, validators=None):
+        validators["etag"] = '"v2"'
+        validators["last_modified"] = "Mon, 01 Jan 2024 00:00:00 GMT"
+        return []
+
+    monkeypatch.setattr(tasks, "fetch_feed", fake_fetch_feed)
+
+    with task_session_factory() as session:
+        session.execute(
+            insert(models.Topic),
+            [
+                {
+                    "name": "Test Topic",
+                    "source": "v2ex",
+                    "feed_url": "https://example.com/rss",
+                    "keywords": [],
+                    "is_active": True,
+                    "updated_at": NOW,
+                }
+            ],
+        )
+        session.commit()
+
+    tasks.fetch_all_topics()
+
+    with task_session_factory() as session:
+        topic = session.scalars(select(models.Topic)).one()
+    assert topic.etag == '"v2"'
+    assert topic.last_modified == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert topic.updated_at.replace(tzinfo=timezone.utc) == NOW
+
+def test_fetch_all_topics_invalidates_counts_when_a_later_topic_fails(
+    task_session_factory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that posts committed before a failure still refresh cached counts."""
+    entries = [
+        {
+            "title": "V2EX Post",
+            "link": "https://v2ex.com/post",
+            "summary": "V2EX content",
+            "uid": "v2ex:post:1",
+            "published_at": NOW,
+        },
+    ]
+
+    async def fake_fetch_feed(source: str, feed_url: str, validators=None):
+        return entries if source == "v2ex" else [{**entries[0], "uid": "ns:1"}]
+
+    store_entries = tasks._store_entries
+
+    def failing_store_entries(session, topic, topic_entries):
+        if topic.source == "nodeseek":
+            raise RuntimeError("database went away")
+        return store_entries(session, topic, topic_entries)
+
+    invalidated = []
+    monkeypatch.setattr(tasks, "fetch_feed", fake_fetch_feed)
+    monkeypatch.setattr(tasks, "_store_entries", failing_store_entries)
+    monkeypatch.setattr(
+        tasks, "invalidate_counts_sync", lambda *tables: invalidated.append(tables)
+    )
+
+    with task_session_factory() as session:
+        session.execute(
+            insert(models.Topic),
+            [
+                {
+                    "name": "V2EX Topic",
+                    "source": "v2ex",
+                    "feed_url": "https://v2ex.com/rss",
+                    "keywords": [],
+                    "is_active": True,
+                },
+                {
+                    "name": "NodeSeek Topic",
+                    "source": "nodeseek",
+                    "feed_url": "https://nodeseek.com/rss",
+                    "keywords": [],
+                    "is_active": True,
+                },
+            ],
+        )
+        session.commit()
+
+    with pytest.raises(RuntimeError):
+        tasks.fetch_all_topics()
+    assert invalidated == [("posts", "push_logs")]